@@ -0,0 +1,128 @@
+import os
+import mmap
+import queue
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import Executor
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+import orjson
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+@cache
+def load_env() -> Mapping[str, str]:
+    """Load the .env file once per process and return the environment."""
+    load_dotenv()
+    return os.environ
+
+@lru_cache(maxsize=256)
+def file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Compute the SHA-256 digest of a file.
+    
+    The modification time and size are part of the memoization key so that
+    repeat lookups within one run skip re-hashing unchanged files.
+    
+    Args:
+        path (str): Path to the file
+        mtime_ns (int): File modification time in nanoseconds
+        size (int): File size in bytes
+    
+    Returns:
+        str: Hex digest of the file content
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        # Python < 3.11: hash a read-only mapping of the file instead of reading a copy
+        if size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+def path_digest(path: Path) -> str:
+    """Get the memoized SHA-256 digest of a file from its current modification time and size."""
+    stat = path.stat()
+    return file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+def load_cache(cache_path: Path):
+    """Load a cached result, returning None when it is missing."""
+    if not cache_path.exists():
+        return None
+    return orjson.loads(cache_path.read_bytes())
+
+def save_cache(cache_path: Path, data) -> None:
+    """Atomically write a result to the cache."""
+    with tempfile.NamedTemporaryFile('wb', dir=cache_path.parent, suffix='.tmp', delete=False) as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+    os.replace(f.name, cache_path)
+
+def list_pdfs(directory: Path) -> List[str]:
+    """
+    List the names of the PDF files in a directory.
+    
+    Uses os.scandir so file types come from the directory listing
+    without a separate stat call per entry.
+    
+    Args:
+        directory (Path): Directory to list
+    
+    Returns:
+        List[str]: Names of the PDF files
+    """
+    with os.scandir(directory) as entries:
+        return [
+            entry.name for entry in entries
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".pdf")
+        ]
+def process_files(
+    executor: Executor,
+    file_names: List[str],
+    load: Callable[[str], Any],
+    save: Callable[[str, Any], Dict],
+    max_pending: Optional[int] = None
+) -> List[Dict]:
+    """
+    Load files on an executor and save each result on the calling thread as it completes.
+    
+    Loaded files wait in a bounded queue for the writer; when it is full, workers block
+    instead of holding more finished documents in memory. Failures are logged and the
+    file is left out of the results.
+    
+    Args:
+        executor (Executor): Thread pool the files are loaded on
+        file_names (List[str]): Names of the files to process
+        load (Callable[[str], Any]): Extracts the content of one file
+        save (Callable[[str, Any], Dict]): Writes the extracted content of one file
+        max_pending (int, optional): Maximum number of loaded files waiting to be saved
+    
+    Returns:
+        List[Dict]: Saved results, in completion order
+    """
+    loaded: queue.Queue = queue.Queue(maxsize=max_pending or 0)
+    
+    def load_one(file_name: str) -> None:
+        logger.info(f"Processing file: {file_name}")
+        try:
+            loaded.put((file_name, load(file_name), None))
+        except Exception as e:
+            loaded.put((file_name, None, e))
+    
+    for file_name in file_names:
+        executor.submit(load_one, file_name)
+    
+    results = []
+    for _ in file_names:
+        file_name, data, error = loaded.get()
+        try:
+            if error is not None:
+                raise error
+            results.append(save(file_name, data))
+        except Exception as e:
+            logger.error(f"Failed to process {file_name}: {str(e)}")
+    return results
\ No newline at end of file
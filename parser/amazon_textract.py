@@ -1,12 +1,23 @@
 import os
+import time
+import uuid
+import hashlib
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator, ClassVar
 from datetime import datetime
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from langchain_community.document_loaders import AmazonTextractPDFLoader
-from dotenv import load_dotenv
+try:
+    from ._common import load_env, path_digest, load_cache, save_cache, list_pdfs, process_files
+except ImportError:
+    # Run as a script from the parser directory
+    from _common import load_env, path_digest, load_cache, save_cache, list_pdfs, process_files
 
 # Configure logging
 logging.basicConfig(
@@ -15,58 +26,252 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Files are processed by remote APIs, so threads mostly wait on network I/O
+DEFAULT_MAX_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+DEFAULT_MAX_CONCURRENT_RESULTS = 32
+
+# HTTP connections kept per AWS client, enough for every worker thread
+MAX_POOL_CONNECTIONS = 50
+
+# Markdown template for one page, bound once and reused for every page
+PAGE_SECTION = "## Page {}\n\n{}\n\n---\n\n".format
+
+# Seconds between status checks of asynchronous Textract jobs
+JOB_POLL_INTERVAL = 5
+
+@lru_cache(maxsize=None)
+def _get_session(region_name: str, aws_access_key: str, aws_secret_key: str) -> boto3.Session:
+    """Get the boto3 session shared by all parsers with the same credentials."""
+    return boto3.Session(
+        region_name=region_name,
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key
+    )
+
+@lru_cache(maxsize=None)
+def _get_client(service_name: str, region_name: str, aws_access_key: str, aws_secret_key: str):
+    """
+    Get a shared AWS client whose connection pool is sized for the worker pool.
+    
+    Args:
+        service_name (str): AWS service name
+        region_name (str): AWS region name
+        aws_access_key (str): AWS access key ID
+        aws_secret_key (str): AWS secret access key
+        
+    Returns:
+        BaseClient: Client for the service
+    """
+    session = _get_session(region_name, aws_access_key, aws_secret_key)
+    return session.client(service_name, config=Config(max_pool_connections=MAX_POOL_CONNECTIONS))
+
 class AmazonTextractParser:
     """Parser class for extracting content from PDFs using Amazon Textract."""
     
-    def __init__(self, region_name: Optional[str] = None):
+    # Set once the output directories exist, so later instances skip the mkdir calls
+    _dirs_ready: ClassVar[bool] = False
+    
+    def __init__(
+        self,
+        region_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_concurrent_results: int = DEFAULT_MAX_CONCURRENT_RESULTS
+    ):
         """
         Initialize parser with AWS configuration.
         
         Args:
             region_name (str, optional): AWS region name. Defaults to environment variable.
+            max_workers (int, optional): Number of files processed in parallel by process_directory.
+            max_concurrent_results (int, optional): Maximum number of extracted files waiting to be written.
         """
-        load_dotenv()
+        env = load_env()
+        
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.max_concurrent_results = max_concurrent_results
         
         # Initialize AWS configuration
-        self.region_name = region_name or os.getenv("AWS_REGION", "us-east-1")
-        self.aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
-        self.aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+        self.region_name = region_name or env.get("AWS_REGION", "us-east-1")
+        self.aws_access_key = env.get("AWS_ACCESS_KEY_ID")
+        self.aws_secret_key = env.get("AWS_SECRET_ACCESS_KEY")
         
         if not all([self.aws_access_key, self.aws_secret_key]):
             raise ValueError("AWS credentials not found in environment variables")
         
-        # Initialize AWS client
-        self.textract_client = boto3.client(
-            "textract",
-            region_name=self.region_name,
-            aws_access_key_id=self.aws_access_key,
-            aws_secret_access_key=self.aws_secret_key
-        )
+        # S3 staging bucket and optional SNS channel for asynchronous text detection jobs
+        self.s3_bucket = env.get("AWS_TEXTRACT_S3_BUCKET")
+        self.sns_topic_arn = env.get("AWS_TEXTRACT_SNS_TOPIC_ARN")
+        self.sns_role_arn = env.get("AWS_TEXTRACT_SNS_ROLE_ARN")
+        
+        # S3 key of the staged copy each started job reads, deleted once the job is done with
+        self._staged_keys: Dict[str, str] = {}
+        
+        # Initialize AWS clients, shared across parser instances
+        self.textract_client = _get_client("textract", self.region_name, self.aws_access_key, self.aws_secret_key)
+        self.s3_client = _get_client("s3", self.region_name, self.aws_access_key, self.aws_secret_key)
         
         # Setup project directories
         self.project_root = Path(__file__).parent.parent.parent
         self.data_dir = self.project_root / "data"
         self.output_dir = self.project_root / "output"
-        self.output_dir.mkdir(exist_ok=True)
+        self.cache_dir = self.output_dir / ".cache"
+        if not type(self)._dirs_ready:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            type(self)._dirs_ready = True
 
-    def process_pdf(self, file_name: str) -> Dict:
+    def _cache_path(self, input_path: Path) -> Path:
         """
-        Process a single PDF file using Amazon Textract.
+        Get the cache file for an input file and the current Textract settings.
         
         Args:
-            file_name (str): Name of the PDF file in the data directory
+            input_path (Path): Path to the PDF file
             
         Returns:
-            Dict: Processing results including file info and content
+            Path: Location of the cached extraction results
         """
-        input_path = self.data_dir / file_name
+        digest = path_digest(input_path)
         
-        if not input_path.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
+        # The job API and the loader format pages differently, so each gets its own entry
+        mode = "job" if self.s3_bucket else "loader"
+        key = hashlib.sha256(f"{digest}:textract:{self.region_name}:{mode}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _staging_key(self, input_path: Path) -> str:
+        """
+        Get a new S3 key to stage a PDF under for an asynchronous Textract job.
         
-        logger.info(f"Processing file: {file_name}")
+        Each submission gets its own key, so jobs for identical files never share
+        or delete each other's staged copy.
         
+        Args:
+            input_path (Path): Path to the PDF file
+            
+        Returns:
+            str: S3 object key
+        """
+        return f"textract/{path_digest(input_path)}-{uuid.uuid4().hex}.pdf"
+
+    def _delete_staged(self, s3_key: str, input_path: Path) -> None:
+        """
+        Delete a staged copy of a PDF from S3, logging rather than raising on failure.
+        
+        Args:
+            s3_key (str): S3 object key of the staged copy
+            input_path (Path): Path to the PDF file the copy was made from
+        """
         try:
+            self.s3_client.delete_object(Bucket=self.s3_bucket, Key=s3_key)
+        except ClientError as e:
+            logger.warning(f"Could not delete staged copy of {input_path.name}: {str(e)}")
+
+    def _release_job(self, job_id: str, input_path: Path) -> None:
+        """
+        Delete the staged copy read by a job, once its results are no longer needed.
+        
+        Args:
+            job_id (str): Textract job ID
+            input_path (Path): Path to the PDF file the job reads
+        """
+        s3_key = self._staged_keys.pop(job_id, None)
+        if s3_key is not None:
+            self._delete_staged(s3_key, input_path)
+
+    def _start_text_detection(self, input_path: Path) -> str:
+        """
+        Upload a PDF to S3 and start an asynchronous Textract text detection job.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            
+        Returns:
+            str: Textract job ID
+        """
+        s3_key = self._staging_key(input_path)
+        
+        with open(input_path, 'rb') as f:
+            self.s3_client.upload_fileobj(f, self.s3_bucket, s3_key)
+        
+        params = {
+            "DocumentLocation": {"S3Object": {"Bucket": self.s3_bucket, "Name": s3_key}}
+        }
+        if self.sns_topic_arn and self.sns_role_arn:
+            params["NotificationChannel"] = {
+                "SNSTopicArn": self.sns_topic_arn,
+                "RoleArn": self.sns_role_arn
+            }
+        
+        try:
+            job_id = self.textract_client.start_document_text_detection(**params)["JobId"]
+        except Exception:
+            self._delete_staged(s3_key, input_path)
+            raise
+        self._staged_keys[job_id] = s3_key
+        logger.info(f"Started Textract job {job_id} for: {input_path.name}")
+        return job_id
+
+    def _get_text_detection_pages(self, job_id: str, input_path: Path) -> List[Dict]:
+        """
+        Wait for an asynchronous Textract job and collect the text of each page.
+        
+        The staged S3 copy of the PDF is deleted once the job has finished, or when
+        waiting for it fails.
+        
+        Args:
+            job_id (str): Textract job ID
+            input_path (Path): Path to the PDF file the job reads
+            
+        Returns:
+            List[Dict]: Content and metadata for each page
+        """
+        try:
+            response = self.textract_client.get_document_text_detection(JobId=job_id)
+            while response["JobStatus"] == "IN_PROGRESS":
+                time.sleep(JOB_POLL_INTERVAL)
+                response = self.textract_client.get_document_text_detection(JobId=job_id)
+        finally:
+            # Results are fetched from Textract, so the staged copy is no longer needed
+            self._release_job(job_id, input_path)
+        
+        if response["JobStatus"] == "FAILED":
+            raise RuntimeError(f"Textract job {job_id} failed: {response.get('StatusMessage')}")
+        
+        page_count = response["DocumentMetadata"]["Pages"]
+        page_lines: Dict[int, List[str]] = defaultdict(list)
+        
+        # Results are paginated; collect LINE blocks from every page of the response
+        while True:
+            for block in response["Blocks"]:
+                if block["BlockType"] == "LINE":
+                    page_lines[block.get("Page", 1)].append(block["Text"])
+            
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+            response = self.textract_client.get_document_text_detection(JobId=job_id, NextToken=next_token)
+        
+        return [
+            {
+                "content": "\n".join(page_lines[page_number]),
+                "metadata": {"source": str(input_path), "page": page_number}
+            }
+            for page_number in range(1, page_count + 1)
+        ]
+
+    def _extract_pages(self, input_path: Path, job_id: Optional[str] = None) -> List[Dict]:
+        """
+        Extract page content from a PDF with Textract.
+        
+        Uses the asynchronous job API when an S3 staging bucket is configured,
+        otherwise the synchronous API through AmazonTextractPDFLoader.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            job_id (str, optional): ID of a text detection job already started for this file
+            
+        Returns:
+            List[Dict]: Content and metadata for each page
+        """
+        if not self.s3_bucket:
             # Initialize loader with Textract client
             loader = AmazonTextractPDFLoader(
                 str(input_path),
@@ -75,37 +280,121 @@ class AmazonTextractParser:
             
             # Extract content
             docs = loader.load()
+            return [{"content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+        
+        job_id = job_id or self._start_text_detection(input_path)
+        return self._get_text_detection_pages(job_id, input_path)
+
+    def _iter_pages(self, pages: List[Dict]) -> Iterator[Dict]:
+        """
+        Yield numbered page records from extracted Textract pages.
+        
+        Args:
+            pages (List[Dict]): Extracted page content and metadata
             
-            # Prepare results
-            results = {
-                "file_name": file_name,
-                "processed_at": datetime.now().isoformat(),
-                "pages": []
+        Yields:
+            Dict: Page number, content and metadata for each page
+        """
+        for i, page in enumerate(pages):
+            yield {
+                "page_number": i + 1,
+                "content": page["content"],
+                "metadata": page["metadata"]
             }
+
+    def _format_page(self, page: Dict) -> bytes:
+        """
+        Render a page record as a UTF-8 encoded Markdown section.
+        
+        Args:
+            page (Dict): Page record produced by _iter_pages
+            
+        Returns:
+            bytes: Markdown for the page
+        """
+        return PAGE_SECTION(page["page_number"], page["content"]).encode('utf-8')
+
+    def _load_pages(self, file_name: str, job_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get the extracted pages of a PDF file, reusing cached results when available.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            job_id (str, optional): ID of a text detection job already started for this file
             
-            # Process each page
-            for i, doc in enumerate(docs):
-                results["pages"].append({
-                    "page_number": i + 1,
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                })
-            
-            # Save results
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_dir / f"{file_name.rsplit('.', 1)[0]}_{timestamp}.md"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Textract Results for {file_name}\n\n")
-                f.write(f"Processed at: {results['processed_at']}\n\n")
-                
-                for page in results["pages"]:
-                    f.write(f"## Page {page['page_number']}\n\n")
-                    f.write(page["content"])
-                    f.write("\n\n---\n\n")
-            
-            logger.info(f"Results saved to: {output_file}")
-            return results
+        Returns:
+            List[Dict]: Content and metadata for each page
+        """
+        input_path = self.data_dir / file_name
+        cache_path = self._cache_path(input_path)
+        pages = load_cache(cache_path)
+        
+        if pages is None:
+            pages = self._extract_pages(input_path, job_id)
+            save_cache(cache_path, pages)
+        else:
+            logger.info(f"Using cached Textract results for: {file_name}")
+            # Another file with the same content was cached after this job started
+            if job_id is not None:
+                self._release_job(job_id, input_path)
+        return pages
+
+    def _save_results(self, file_name: str, pages: List[Dict]) -> Dict:
+        """
+        Write extracted pages to a Markdown file in the output directory.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            pages (List[Dict]): Content and metadata for each page
+            
+        Returns:
+            Dict: Processing results including file info, page count and output file path
+        """
+        # One clock read serves both the report timestamp and the file name
+        now = datetime.now()
+        processed_at = now.isoformat()
+        
+        # Save results page by page
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        output_file = self.output_dir / f"{Path(file_name).stem}_{timestamp}.md"
+        page_count = 0
+        
+        with open(output_file, 'wb') as f:
+            f.write(f"# Textract Results for {file_name}\n\nProcessed at: {processed_at}\n\n".encode('utf-8'))
+            
+            for page in self._iter_pages(pages):
+                f.write(self._format_page(page))
+                page_count += 1
+        
+        logger.info(f"Results saved to: {output_file}")
+        return {
+            "file_name": file_name,
+            "processed_at": processed_at,
+            "page_count": page_count,
+            "output_file": str(output_file)
+        }
+
+    def process_pdf(self, file_name: str, job_id: Optional[str] = None) -> Dict:
+        """
+        Process a single PDF file using Amazon Textract.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            job_id (str, optional): ID of a text detection job already started for this file
+            
+        Returns:
+            Dict: Processing results including file info, page count and output file path
+        """
+        input_path = self.data_dir / file_name
+        
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        logger.info(f"Processing file: {file_name}")
+        
+        try:
+            pages = self._load_pages(file_name, job_id)
+            return self._save_results(file_name, pages)
             
         except ClientError as e:
             logger.error(f"AWS Textract error: {str(e)}")
@@ -121,17 +410,46 @@ class AmazonTextractParser:
         Returns:
             List[Dict]: List of processing results for each file
         """
-        results = []
+        file_names = list_pdfs(self.data_dir)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Start all asynchronous jobs first so Textract works on them while results are drained
+            job_ids = self._start_jobs(executor, file_names) if self.s3_bucket else {}
+            
+            return process_files(
+                executor,
+                file_names,
+                lambda file_name: self._load_pages(file_name, job_ids.get(file_name)),
+                self._save_results,
+                self.max_concurrent_results
+            )
+
+    def _start_jobs(self, executor: ThreadPoolExecutor, file_names: List[str]) -> Dict[str, str]:
+        """
+        Start asynchronous Textract jobs for all files without cached results.
+        
+        Files whose job fails to start are left out and retried by process_pdf.
+        
+        Args:
+            executor (ThreadPoolExecutor): Executor used to upload files concurrently
+            file_names (List[str]): Names of the PDF files in the data directory
+            
+        Returns:
+            Dict[str, str]: Textract job ID for each started file
+        """
+        futures = {
+            executor.submit(self._start_text_detection, self.data_dir / file_name): file_name
+            for file_name in file_names
+            if not self._cache_path(self.data_dir / file_name).exists()
+        }
         
-        for pdf_file in self.data_dir.glob("*.pdf"):
+        job_ids = {}
+        for future in as_completed(futures):
             try:
-                result = self.process_pdf(pdf_file.name)
-                results.append(result)
+                job_ids[futures[future]] = future.result()
             except Exception as e:
-                logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
-                continue
-        
-        return results
+                logger.warning(f"Could not start Textract job for {futures[future]}: {str(e)}")
+        return job_ids
 
 def main():
     """Main function to demonstrate PDF content extraction using Amazon Textract."""
@@ -147,10 +465,8 @@ def main():
         logger.info("Processing completed successfully")
         
         # Print sample results
-        print("\nExtracted Content:")
-        for page in results["pages"]:
-            print(f"\n--- Page {page['page_number']} ---\n")
-            print(page["content"])
+        print(f"\nExtracted Content ({results['page_count']} pages):")
+        print(Path(results["output_file"]).read_text(encoding='utf-8'))
         
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
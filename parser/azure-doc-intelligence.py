@@ -1,13 +1,20 @@
-import os
+import asyncio
+import hashlib
 import logging
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator, ClassVar, AsyncIterator, Awaitable, Callable, Tuple
 from datetime import datetime
-from dotenv import load_dotenv
+import numpy as np
+try:
+    from ._common import load_env, load_cache, save_cache
+except ImportError:
+    # Run as a script from the parser directory
+    from _common import load_env, load_cache, save_cache
 from azure.core.credentials import AzureKeyCredential
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
-from azure.storage.blob import BlobServiceClient
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+from azure.ai.documentintelligence.models import AnalyzeDocumentRequest, AnalyzeResult
+from azure.storage.blob.aio import BlobClient, ContainerClient
 from azure.core.exceptions import AzureError
 
 # Configure logging
@@ -17,16 +24,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MODEL_ID = "prebuilt-layout"
+
+# Markdown templates, bound once and reused for every page, line and cell
+PAGE_HEADER = "## Page {}\n\n### Text Content\n\n".format
+LINE = "{}\n".format
+TABLE_HEADER = "#### Table {}\n\n".format
+CELL_LINE = "Row {}, Col {}: {}\n".format
+
+# Cap on concurrent analysis requests to stay within the service rate limit
+DEFAULT_MAX_CONCURRENCY = 8
+
 class AzureDocParser:
     """Parser class for extracting content from documents using Azure Document Intelligence."""
     
-    def __init__(self):
-        """Initialize parser with Azure credentials and configuration."""
-        load_dotenv()
+    # Set once the output directories exist, so later instances skip the mkdir calls
+    _dirs_ready: ClassVar[bool] = False
+    
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Initialize parser with Azure credentials and configuration.
+        
+        Args:
+            max_concurrency (int, optional): Maximum number of documents analyzed at the same time.
+        """
+        env = load_env()
         
         # Initialize Azure credentials
-        self.endpoint = os.getenv("DOCUMENTINTELLIGENCE_ENDPOINT")
-        self.key = os.getenv("DOCUMENTINTELLIGENCE_API_KEY")
+        self.endpoint = env.get("DOCUMENTINTELLIGENCE_ENDPOINT")
+        self.key = env.get("DOCUMENTINTELLIGENCE_API_KEY")
         
         if not all([self.endpoint, self.key]):
             raise ValueError("Azure Document Intelligence credentials not found in environment variables")
@@ -36,12 +62,55 @@ class AzureDocParser:
             endpoint=self.endpoint,
             credential=AzureKeyCredential(self.key)
         )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         
         # Setup project directories
         self.project_root = Path(__file__).parent.parent.parent
         self.data_dir = self.project_root / "data"
         self.output_dir = self.project_root / "output"
-        self.output_dir.mkdir(exist_ok=True)
+        self.cache_dir = self.output_dir / ".cache"
+        if not type(self)._dirs_ready:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            type(self)._dirs_ready = True
+
+    async def __aenter__(self) -> "AzureDocParser":
+        """Enter an async context that closes the client on exit."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the client when leaving the async context."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the Document Intelligence and storage clients and their connections."""
+        await self.client.close()
+        if "_container_client" in self.__dict__:
+            await self._container_client.close()
+
+    @cached_property
+    def _container_client(self) -> ContainerClient:
+        """Client for the configured storage container, created on first use."""
+        env = load_env()
+        connection_string = env.get("AZURE_STORAGE_CONNECTION_STRING")
+        container_name = env.get("AZURE_STORAGE_CONTAINER_NAME")
+        
+        if not all([connection_string, container_name]):
+            raise ValueError("Azure Storage credentials not found in environment variables")
+        
+        return ContainerClient.from_connection_string(connection_string, container_name)
+
+    def _get_blob_client(self, blob_name: str) -> BlobClient:
+        """
+        Get a client for a blob in Azure Storage.
+        
+        Args:
+            blob_name (str): Name of the blob
+            
+        Returns:
+            BlobClient: Client for the blob
+        """
+        return self._container_client.get_blob_client(blob_name)
 
     def get_blob_url(self, blob_name: str) -> str:
         """
@@ -54,79 +123,165 @@ class AzureDocParser:
             str: URL of the blob
         """
         try:
-            connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-            container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
-            
-            if not all([connection_string, container_name]):
-                raise ValueError("Azure Storage credentials not found in environment variables")
-            
-            blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-            container_client = blob_service_client.get_container_client(container_name)
-            blob_client = container_client.get_blob_client(blob_name)
-            
-            return blob_client.url
+            return self._get_blob_client(blob_name).url
             
         except Exception as e:
             logger.error(f"Error accessing blob storage: {str(e)}")
             raise
 
-    def analyze_document(self, document_url: str) -> Dict:
+    def get_blob_urls(self, blob_names: List[str]) -> List[str]:
         """
-        Analyze a document using Azure Document Intelligence.
+        Get URLs for several blobs in Azure Storage.
+        
+        Args:
+            blob_names (List[str]): Names of the blobs
+            
+        Returns:
+            List[str]: URLs of the blobs in the same order
+        """
+        return [self.get_blob_url(blob_name) for blob_name in blob_names]
+
+    def _cache_path(self, document_url: str, version: str) -> Path:
+        """
+        Get the cache file for a document version and the analysis model.
+        
+        Args:
+            document_url (str): URL of the document
+            version (str): Version identifier of the document content
+            
+        Returns:
+            Path: Location of the cached analysis result
+        """
+        key = hashlib.sha256(f"{document_url}:{version}:{MODEL_ID}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    async def _get_analyze_result(self, document_url: str, version: Optional[str] = None) -> AnalyzeResult:
+        """
+        Run layout analysis on a document, reusing a cached result when available.
         
         Args:
             document_url (str): URL of the document to analyze
+            version (str, optional): Version of the document content, such as the blob ETag.
+                Analysis results are cached per version; caching is skipped when omitted.
             
         Returns:
-            Dict: Analysis results including text content and metadata
+            AnalyzeResult: Raw analysis result
         """
-        try:
+        cache_path = self._cache_path(document_url, version) if version else None
+        cached = load_cache(cache_path) if cache_path else None
+        
+        if cached is not None:
+            logger.info(f"Using cached analysis for: {document_url}")
+            return AnalyzeResult(cached)
+        
+        async with self._semaphore:
             logger.info(f"Analyzing document: {document_url}")
             
-            poller = self.client.begin_analyze_document(
-                "prebuilt-layout",
+            poller = await self.client.begin_analyze_document(
+                MODEL_ID,
                 AnalyzeDocumentRequest(url_source=document_url)
             )
-            result = poller.result()
+            result = await poller.result()
+        
+        if cache_path:
+            save_cache(cache_path, result.as_dict())
+        return result
+
+    def _iter_pages(self, result: AnalyzeResult) -> Iterator[Dict]:
+        """
+        Yield the lines and tables of each analyzed page.
+        
+        Args:
+            result (AnalyzeResult): Raw analysis result
             
-            # Prepare results
-            analysis_results = {
-                "analyzed_at": datetime.now().isoformat(),
-                "document_url": document_url,
-                "pages": []
+        Yields:
+            Dict: Page number, text lines and tables for each page
+        """
+        for page in result.pages:
+            # Extract text lines and tables
+            lines = page.lines or []
+            tables = page.tables or []
+            
+            yield {
+                "page_number": page.page_number,
+                "lines": [
+                    {"content": line.content, "bounding_box": getattr(line, "bounding_box", None)}
+                    for line in lines
+                ],
+                "tables": [self._table_arrays(table) for table in tables]
             }
+
+    def _table_arrays(self, table) -> Dict:
+        """
+        Store the cells of a table as parallel arrays.
+        
+        Args:
+            table (DocumentTable): Table from the analysis result
             
-            # Extract content page by page
-            for page in result.pages:
-                page_content = {
-                    "page_number": page.page_number,
-                    "lines": [],
-                    "tables": []
-                }
-                
-                # Extract text lines
-                if page.lines:
-                    for line in page.lines:
-                        page_content["lines"].append({
-                            "content": line.content,
-                            "bounding_box": line.bounding_box if hasattr(line, 'bounding_box') else None
-                        })
-                
-                # Extract tables
-                if page.tables:
-                    for table in page.tables:
-                        table_data = []
-                        for cell in table.cells:
-                            table_data.append({
-                                "text": cell.content,
-                                "row_index": cell.row_index,
-                                "column_index": cell.column_index
-                            })
-                        page_content["tables"].append(table_data)
-                
-                analysis_results["pages"].append(page_content)
+        Returns:
+            Dict: Cell texts plus numpy arrays of their row and column indices
+        """
+        cells = table.cells
+        return {
+            "texts": [cell.content for cell in cells],
+            "rows": np.fromiter((cell.row_index for cell in cells), dtype=np.int16, count=len(cells)),
+            "cols": np.fromiter((cell.column_index for cell in cells), dtype=np.int16, count=len(cells))
+        }
+
+    def _format_page(self, page: Dict) -> bytes:
+        """
+        Render an analyzed page as a UTF-8 encoded Markdown section.
+        
+        Args:
+            page (Dict): Page record produced by _iter_pages
             
-            return analysis_results
+        Returns:
+            bytes: Markdown for the page
+        """
+        parts: List[str] = [PAGE_HEADER(page["page_number"])]
+        
+        # Text content
+        parts.extend(LINE(line["content"]) for line in page["lines"])
+        
+        # Table content
+        if page["tables"]:
+            parts.append("\n### Tables\n\n")
+            for table_idx, table in enumerate(page["tables"], 1):
+                parts.append(TABLE_HEADER(table_idx))
+                # Create markdown table (simplified), cells ordered by row then column
+                rows, cols, texts = table["rows"], table["cols"], table["texts"]
+                order = np.lexsort((cols, rows))
+                parts.append("".join(map(
+                    CELL_LINE,
+                    rows[order].tolist(),
+                    cols[order].tolist(),
+                    [texts[i] for i in order]
+                )))
+        
+        parts.append("\n---\n\n")
+        return "".join(parts).encode('utf-8')
+
+    async def analyze_document(self, document_url: str, version: Optional[str] = None) -> Dict:
+        """
+        Analyze a document using Azure Document Intelligence.
+        
+        Args:
+            document_url (str): URL of the document to analyze
+            version (str, optional): Version of the document content, such as the blob ETag.
+                Analysis results are cached per version; caching is skipped when omitted.
+            
+        Returns:
+            Dict: Analysis results including text content and metadata. Each table
+                holds its cell texts with numpy arrays of row and column indices.
+        """
+        try:
+            result = await self._get_analyze_result(document_url, version)
+            
+            return {
+                "analyzed_at": datetime.now().isoformat(),
+                "document_url": document_url,
+                "pages": list(self._iter_pages(result))
+            }
             
         except AzureError as e:
             logger.error(f"Azure service error: {str(e)}")
@@ -135,73 +290,155 @@ class AzureDocParser:
             logger.error(f"Error analyzing document: {str(e)}")
             raise
 
-    def process_document(self, blob_name: str) -> Dict:
+    async def _iter_completed(
+        self,
+        func: Callable[[str], Awaitable[Dict]],
+        items: List[str]
+    ) -> AsyncIterator[Tuple[int, asyncio.Task]]:
+        """
+        Run a coroutine function over items, yielding each task as it finishes.
+        
+        At most max_concurrency tasks are outstanding; a new item is started as
+        soon as one finishes, so a slow document never holds up the others. When the
+        generator is closed early, tasks still outstanding are cancelled and awaited.
+        
+        Args:
+            func (Callable): Coroutine function called with each item
+            items (List[str]): Items to process
+            
+        Yields:
+            Tuple[int, asyncio.Task]: Index of the item and its finished task
+        """
+        remaining = iter(enumerate(items))
+        pending: Dict[asyncio.Task, int] = {}
+        
+        def start_next() -> None:
+            for index, item in remaining:
+                pending[asyncio.create_task(func(item))] = index
+                return
+        
+        try:
+            for _ in range(self.max_concurrency):
+                start_next()
+            
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start_next()
+                    yield pending[task], task
+                    del pending[task]
+        finally:
+            # Tasks not yet handed to the caller: cancel the running ones and retrieve
+            # every outcome so no exception goes unobserved
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def analyze_many(self, document_urls: List[str]) -> List[Dict]:
+        """
+        Analyze several documents concurrently.
+        
+        Args:
+            document_urls (List[str]): URLs of the documents to analyze
+            
+        Returns:
+            List[Dict]: Analysis results in the same order as document_urls
+        """
+        results: List[Optional[Dict]] = [None] * len(document_urls)
+        completed = self._iter_completed(self.analyze_document, document_urls)
+        try:
+            async for index, task in completed:
+                results[index] = task.result()
+        finally:
+            await completed.aclose()
+        return results
+
+    async def process_documents(self, blob_names: List[str]) -> List[Dict]:
+        """
+        Process several documents from Azure Blob Storage concurrently.
+        
+        Each document is written to disk as soon as its analysis finishes.
+        
+        Args:
+            blob_names (List[str]): Names of the blobs containing the documents
+            
+        Returns:
+            List[Dict]: Processing results for each successful document, in completion order
+        """
+        results = []
+        completed = self._iter_completed(self.process_document, blob_names)
+        try:
+            async for index, task in completed:
+                try:
+                    results.append(task.result())
+                except Exception as e:
+                    logger.error(f"Failed to process {blob_names[index]}: {str(e)}")
+        finally:
+            await completed.aclose()
+        return results
+
+    async def process_document(self, blob_name: str) -> Dict:
         """
         Process a document from Azure Blob Storage.
         
+        Pages are written to the output file as they are extracted, so only
+        summary information is returned.
+        
         Args:
             blob_name (str): Name of the blob containing the document
             
         Returns:
-            Dict: Processing results
+            Dict: Processing results including page count and output file path
         """
         try:
-            # Get document URL from blob storage
-            document_url = self.get_blob_url(blob_name)
+            # Get document URL and content version from blob storage
+            blob_client = self._get_blob_client(blob_name)
+            properties = await blob_client.get_blob_properties()
             
             # Analyze document
-            results = self.analyze_document(document_url)
+            result = await self._get_analyze_result(blob_client.url, version=properties.etag)
+            # One clock read serves both the report timestamp and the file name
+            now = datetime.now()
+            analyzed_at = now.isoformat()
             
-            # Save results
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Save results page by page
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             output_file = self.output_dir / f"{blob_name}_{timestamp}.md"
+            page_count = 0
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Document Analysis Results\n\n")
-                f.write(f"Document: {blob_name}\n")
-                f.write(f"Analyzed at: {results['analyzed_at']}\n\n")
+            with open(output_file, 'wb') as f:
+                f.write(f"# Document Analysis Results\n\nDocument: {blob_name}\nAnalyzed at: {analyzed_at}\n\n".encode('utf-8'))
                 
-                for page in results["pages"]:
-                    f.write(f"## Page {page['page_number']}\n\n")
-                    
-                    # Write text content
-                    f.write("### Text Content\n\n")
-                    for line in page["lines"]:
-                        f.write(f"{line['content']}\n")
-                    
-                    # Write table content
-                    if page["tables"]:
-                        f.write("\n### Tables\n\n")
-                        for table_idx, table in enumerate(page["tables"], 1):
-                            f.write(f"#### Table {table_idx}\n\n")
-                            # Create markdown table (simplified)
-                            for cell in table:
-                                f.write(f"Row {cell['row_index']}, Col {cell['column_index']}: {cell['text']}\n")
-                    
-                    f.write("\n---\n\n")
+                for page in self._iter_pages(result):
+                    f.write(self._format_page(page))
+                    page_count += 1
             
             logger.info(f"Results saved to: {output_file}")
-            return results
+            return {
+                "file_name": blob_name,
+                "analyzed_at": analyzed_at,
+                "page_count": page_count,
+                "output_file": str(output_file)
+            }
             
         except Exception as e:
             logger.error(f"Error processing document {blob_name}: {str(e)}")
             raise
 
-def main():
+async def main():
     """Main function to demonstrate document analysis using Azure Document Intelligence."""
     try:
-        parser = AzureDocParser()
-        
-        # Process sample document
-        blob_name = "sample-document.pdf"
-        logger.info(f"Processing document: {blob_name}")
-        
-        results = parser.process_document(blob_name)
-        logger.info("Processing completed successfully")
+        async with AzureDocParser() as parser:
+            # Process sample document
+            blob_name = "sample-document.pdf"
+            logger.info(f"Processing document: {blob_name}")
+            
+            results = await parser.process_document(blob_name)
+            logger.info("Processing completed successfully")
         
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
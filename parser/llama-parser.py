@@ -1,10 +1,17 @@
 import os
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import nest_asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, ClassVar
 from llama_parse import LlamaParse
-from dotenv import load_dotenv
+try:
+    from ._common import load_env, path_digest, load_cache, save_cache, list_pdfs, process_files
+except ImportError:
+    # Run as a script from the parser directory
+    from _common import load_env, path_digest, load_cache, save_cache, list_pdfs, process_files
 from datetime import datetime
 
 # Configure logging
@@ -14,42 +21,154 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Files are processed by remote APIs, so threads mostly wait on network I/O
+DEFAULT_MAX_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+DEFAULT_MAX_CONCURRENT_RESULTS = 32
+
+@lru_cache(maxsize=None)
+def get_parser(model_name: str) -> LlamaParse:
+    """
+    Get the LlamaParse instance shared by all parsers using the same model.
+    
+    Args:
+        model_name (str): Llama model name
+        
+    Returns:
+        LlamaParse: Configured parser
+    """
+    return LlamaParse(
+        result_type="markdown",
+        model_name=model_name,
+        max_new_tokens=512,
+        temperature=0.1,
+        top_p=0.95,
+        top_k=40,
+        num_beams=1,
+        do_sample=True,
+        use_gpu=True
+    )
+
 class LlamaDocParser:
     """Parser class for extracting content from PDFs using Llama Parse."""
     
-    def __init__(self, model_name: Optional[str] = None):
+    # Set once the output directories exist, so later instances skip the mkdir calls
+    _dirs_ready: ClassVar[bool] = False
+    
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_concurrent_results: int = DEFAULT_MAX_CONCURRENT_RESULTS
+    ):
         """
         Initialize parser with model configuration.
         
         Args:
             model_name (str, optional): Llama model name. Defaults to environment variable.
+            max_workers (int, optional): Number of files processed in parallel by process_directory.
+            max_concurrent_results (int, optional): Maximum number of extracted files waiting to be written.
         """
-        load_dotenv()
+        env = load_env()
         nest_asyncio.apply()
         
-        self.model_name = model_name or os.getenv(
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.max_concurrent_results = max_concurrent_results
+        
+        self.model_name = model_name or env.get(
             "LLAMA_MODEL_NAME", 
             "meta-llama/Meta-Llama-3-8B-Instruct"
         )
         
-        # Initialize parser with configuration
-        self.parser = LlamaParse(
-            result_type="markdown",
-            model_name=self.model_name,
-            max_new_tokens=512,
-            temperature=0.1,
-            top_p=0.95,
-            top_k=40,
-            num_beams=1,
-            do_sample=True,
-            use_gpu=True
-        )
+        # Reuse the parser (and its HTTP client) configured for this model
+        self.parser = get_parser(self.model_name)
         
         # Setup project directories
         self.project_root = Path(__file__).parent.parent.parent
         self.data_dir = self.project_root / "data"
         self.output_dir = self.project_root / "output"
-        self.output_dir.mkdir(exist_ok=True)
+        self.cache_dir = self.output_dir / ".cache"
+        if not type(self)._dirs_ready:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            type(self)._dirs_ready = True
+
+    def _cache_path(self, input_path: Path) -> Path:
+        """
+        Get the cache file for an input file and the current parser settings.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            
+        Returns:
+            Path: Location of the cached parsing results
+        """
+        digest = path_digest(input_path)
+        key = hashlib.sha256(f"{digest}:llama-parse:{self.model_name}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _load_texts(self, file_name: str) -> List[str]:
+        """
+        Get the parsed chunk texts of a PDF file, reusing cached results when available.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            
+        Returns:
+            List[str]: Text of each parsed document chunk
+        """
+        input_path = self.data_dir / file_name
+        cache_path = self._cache_path(input_path)
+        texts = load_cache(cache_path)
+        
+        if texts is None:
+            # Process document
+            documents = self.parser.load_data(str(input_path))
+            texts = [doc.text for doc in documents]
+            save_cache(cache_path, texts)
+        else:
+            logger.info(f"Using cached parsing results for: {file_name}")
+        return texts
+
+    def _save_results(self, file_name: str, texts: List[str]) -> Dict:
+        """
+        Write parsed chunks to a Markdown file in the output directory.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            texts (List[str]): Text of each parsed document chunk
+            
+        Returns:
+            Dict: Processed parsing results including file info and content
+        """
+        # One clock read serves both the report timestamp and the file name
+        now = datetime.now()
+        
+        # Prepare results
+        results = {
+            "file_name": file_name,
+            "processed_at": now.isoformat(),
+            "chunks": []
+        }
+        
+        # Extract content
+        for i, text in enumerate(texts):
+            results["chunks"].append({
+                "chunk_number": i + 1,
+                "content": text
+            })
+        
+        # Save results
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        output_file = self.output_dir / f"{Path(file_name).stem}_{timestamp}.md"
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(f"# Parsing Results for {file_name}\n\n")
+            for chunk in results["chunks"]:
+                f.write(f"## Document Chunk {chunk['chunk_number']}\n\n")
+                f.write(chunk["content"])
+                f.write("\n\n---\n\n")
+        
+        logger.info(f"Results saved to: {output_file}")
+        return results
 
     def process_pdf(self, file_name: str) -> Dict:
         """
@@ -69,36 +188,8 @@ class LlamaDocParser:
         logger.info(f"Processing file: {file_name}")
         
         try:
-            # Process document
-            documents = self.parser.load_data(str(input_path))
-            
-            # Prepare results
-            results = {
-                "file_name": file_name,
-                "processed_at": datetime.now().isoformat(),
-                "chunks": []
-            }
-            
-            # Extract content
-            for i, doc in enumerate(documents):
-                results["chunks"].append({
-                    "chunk_number": i + 1,
-                    "content": doc.text
-                })
-            
-            # Save results
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_dir / f"{file_name.rsplit('.', 1)[0]}_{timestamp}.md"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Parsing Results for {file_name}\n\n")
-                for chunk in results["chunks"]:
-                    f.write(f"## Document Chunk {chunk['chunk_number']}\n\n")
-                    f.write(chunk["content"])
-                    f.write("\n\n---\n\n")
-            
-            logger.info(f"Results saved to: {output_file}")
-            return results
+            texts = self._load_texts(file_name)
+            return self._save_results(file_name, texts)
             
         except Exception as e:
             logger.error(f"Error processing {file_name}: {str(e)}")
@@ -111,17 +202,14 @@ class LlamaDocParser:
         Returns:
             List[Dict]: List of processing results for each file
         """
-        results = []
-        
-        for pdf_file in self.data_dir.glob("*.pdf"):
-            try:
-                result = self.process_pdf(pdf_file.name)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
-                continue
-        
-        return results
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return process_files(
+                executor,
+                list_pdfs(self.data_dir),
+                self._load_texts,
+                self._save_results,
+                self.max_concurrent_results
+            )
 
 def main():
     """Main function to demonstrate PDF content extraction using Llama Parse."""
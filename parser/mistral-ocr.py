@@ -1,9 +1,23 @@
-import os
+import time
+import atexit
+import random
+import gc
+import asyncio
+import hashlib
 import logging
+import shutil
+import tempfile
+import weakref
 from pathlib import Path
-from typing import Optional, List, Dict
-from mistralai import Mistral
-from dotenv import load_dotenv
+from typing import Optional, List, Dict, Tuple, Callable, ClassVar
+import orjson
+import aiohttp
+from pypdf import PdfReader, PdfWriter
+try:
+    from ._common import load_env, path_digest, load_cache, save_cache, list_pdfs
+except ImportError:
+    # Run as a script from the parser directory
+    from _common import load_env, path_digest, load_cache, save_cache, list_pdfs
 from datetime import datetime
 
 # Configure logging
@@ -13,35 +27,475 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+OCR_MODEL = "mistral-ocr-latest"
+API_BASE_URL = "https://api.mistral.ai/v1"
+
+# PDFs with more pages than this are split and sent to OCR one slot at a time
+MAX_PAGES_PER_SLOT = 500
+
+# Files larger than this many bytes trigger a garbage collection once processed,
+# so long directory runs do not leave fragmented memory behind
+GC_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+# Markdown heading template bound once for every page, and the encoded rule after each page
+PAGE_HEADER = "## Page {}\n\n".format
+PAGE_SEPARATOR = b"\n\n---\n\n"
+
+# Lifetime of signed URLs requested from the API, and how long one must still be
+# valid for to be reused from the upload cache
+SIGNED_URL_EXPIRY_HOURS = 24
+SIGNED_URL_MIN_REMAINING = 60
+
+# Seconds between status checks of a batch job, and the states in which it is still running
+BATCH_POLL_INTERVAL = 10
+BATCH_RUNNING_STATES = ("QUEUED", "RUNNING")
+
+# Hours a batch job may run before the API times it out; the signed URLs it reads must
+# stay valid for that long, so this is kept below SIGNED_URL_EXPIRY_HOURS
+BATCH_TIMEOUT_HOURS = 20
+
+# HTTP session limits: seconds allowed to connect and for a whole request, connections
+# kept open to the API. Uploads, OCR and downloads scale with document size, so they
+# have no total limit, only a generous wait between reads to catch stalled connections.
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 30
+TRANSFER_READ_TIMEOUT = 300
+TRANSFER_TIMEOUT = aiohttp.ClientTimeout(
+    total=None, sock_connect=CONNECT_TIMEOUT, sock_read=TRANSFER_READ_TIMEOUT
+)
+MAX_CONNECTIONS = 16
+KEEPALIVE_TIMEOUT = 60
+
+# Retries of rate-limited, failed or timed-out requests, with exponential backoff
+# capped at RETRY_MAX_DELAY seconds. Statuses where the request was refused are retried
+# for every method; other failures are only retried for idempotent GET requests, since
+# repeating an upload or OCR call that may have been received would run it again.
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 60
+RETRY_STATUSES = frozenset({429, 503})
+IDEMPOTENT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Default number of files processed at the same time by process_directory
+DEFAULT_CONCURRENCY = 8
+
+# HTTP sessions shared by all parsers using the same API key in the same event loop,
+# with the number of parser instances holding each one
+_sessions: Dict[Tuple[asyncio.AbstractEventLoop, str], aiohttp.ClientSession] = {}
+_session_users: Dict[Tuple[asyncio.AbstractEventLoop, str], int] = {}
+
+def _acquire_session(api_key: str) -> aiohttp.ClientSession:
+    """
+    Get the HTTP session for an API key in the running event loop and count a new user.
+    
+    Sessions are bound to the loop they were created in, so one is kept per loop
+    and API key and shared by every parser instance until its last user releases it.
+    Entries left behind by loops that have since closed are dropped here.
+    
+    Args:
+        api_key (str): Mistral API key
+        
+    Returns:
+        aiohttp.ClientSession: Session with pooled connections to the Mistral API
+    """
+    for key in [key for key in _sessions if key[0].is_closed()]:
+        del _sessions[key]
+        _session_users.pop(key, None)
+    
+    key = (asyncio.get_running_loop(), api_key)
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        session = _sessions[key] = aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, sock_connect=CONNECT_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, keepalive_timeout=KEEPALIVE_TIMEOUT)
+        )
+    _session_users[key] = _session_users.get(key, 0) + 1
+    return session
+
+async def _release_session(api_key: str) -> None:
+    """Release a user of the HTTP session for an API key, closing it once no user is left."""
+    key = (asyncio.get_running_loop(), api_key)
+    users = _session_users.pop(key, 0) - 1
+    if users > 0:
+        _session_users[key] = users
+        return
+    
+    session = _sessions.pop(key, None)
+    if session is not None:
+        await session.close()
+
+@atexit.register
+def _close_sessions() -> None:
+    """Close HTTP sessions whose event loop is still usable when the interpreter exits."""
+    for (loop, _), session in _sessions.items():
+        if not session.closed and not loop.is_closed() and not loop.is_running():
+            loop.run_until_complete(session.close())
+    _sessions.clear()
+    _session_users.clear()
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Get the number of seconds to wait before retrying a request.
+    
+    Args:
+        attempt (int): Number of the failed attempt, starting at 0
+        retry_after (str, optional): Retry-After header sent with the response
+        
+    Returns:
+        float: The delay requested by the server, or a fully jittered exponential backoff,
+            at most RETRY_MAX_DELAY
+    """
+    if retry_after is not None:
+        try:
+            return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def _page_records(response: Dict, offset: int = 0) -> List[Dict]:
+    """Keep the index, shifted by offset, and markdown of each page in an OCR response."""
+    return [{"index": page["index"] + offset, "markdown": page["markdown"]} for page in response["pages"]]
+
 class MistralOCRParser:
     """Parser class for extracting content from PDFs using Mistral OCR API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Set once the output directories exist, so later instances skip the mkdir calls
+    _dirs_ready: ClassVar[bool] = False
+    
+    def __init__(self, api_key: Optional[str] = None, concurrency: Optional[int] = None):
         """
         Initialize parser with API key and base configuration.
         
         Args:
             api_key (str, optional): Mistral API key. Defaults to environment variable.
+            concurrency (int, optional): Number of files processed at the same time by
+                process_directory. Defaults to the OCR_CONCURRENCY environment variable.
         """
-        self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
+        env = load_env()
+        self.api_key = api_key or env.get("MISTRAL_API_KEY")
         if not self.api_key:
             raise ValueError("MISTRAL_API_KEY not set in environment variables")
         
-        # Initialize Mistral client
-        self.client = Mistral(api_key=self.api_key)
+        self.concurrency = concurrency or int(env.get("OCR_CONCURRENCY", DEFAULT_CONCURRENCY))
         
         # Setup project directories
         self.project_root = Path(__file__).parent.parent.parent
         self.data_dir = self.project_root / "data"
         self.output_dir = self.project_root / "output"
-        self.output_dir.mkdir(exist_ok=True)
+        self.cache_dir = self.output_dir / ".cache"
+        # Uploaded files, one record per content digest so reruns can skip the upload
+        self.uploads_dir = self.cache_dir / "uploads"
+        if not type(self)._dirs_ready:
+            self.uploads_dir.mkdir(parents=True, exist_ok=True)
+            type(self)._dirs_ready = True
+        
+        # Event loops in which this instance holds a shared HTTP session
+        self._session_loops = weakref.WeakSet()
+
+    async def __aenter__(self) -> "MistralOCRParser":
+        """Enter an async context that releases the HTTP session on exit."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Release the HTTP session when leaving the async context."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Release this instance's hold on the shared HTTP session. The session and its
+        pooled connections are closed once no other instance in the loop uses it.
+        """
+        loop = asyncio.get_running_loop()
+        if loop in self._session_loops:
+            self._session_loops.discard(loop)
+            await _release_session(self.api_key)
+
+    @property
+    def _session(self) -> aiohttp.ClientSession:
+        """HTTP session for the Mistral REST API, shared across instances in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._session_loops:
+            self._session_loops.add(loop)
+            return _acquire_session(self.api_key)
+        return _sessions[(loop, self.api_key)]
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        form: Optional[Callable[[], aiohttp.FormData]] = None,
+        **kwargs
+    ) -> bytes:
+        """
+        Call a Mistral REST endpoint and read the response body.
+        
+        Rate-limited requests, and requests that never reached the server, are retried
+        with jittered exponential backoff, waiting for the Retry-After delay when the API
+        sends one. GET requests are also retried on server errors and timeouts.
+        
+        Args:
+            method (str): HTTP method
+            path (str): Endpoint path relative to the API base URL
+            form (Callable, optional): Builds the multipart request body. A form can only
+                be sent once, so it is rebuilt for every attempt.
+            **kwargs: Extra arguments passed to the session request
+            
+        Returns:
+            bytes: Response body
+        """
+        if method == "GET":
+            retry_statuses = IDEMPOTENT_RETRY_STATUSES
+            retry_errors = (asyncio.TimeoutError, aiohttp.ClientConnectionError)
+        else:
+            retry_statuses = RETRY_STATUSES
+            retry_errors = (aiohttp.ClientConnectorError,)
+        
+        for attempt in range(MAX_RETRIES + 1):
+            if form is not None:
+                kwargs["data"] = form()
+            
+            try:
+                async with self._session.request(method, f"{API_BASE_URL}/{path}", **kwargs) as response:
+                    if response.status not in retry_statuses or attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                        return await response.read()
+                    
+                    delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+                    reason = f"HTTP {response.status}"
+            except retry_errors as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt)
+                reason = type(e).__name__
+            
+            logger.warning(f"{method} {path} failed ({reason}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict:
+        """
+        Call a Mistral REST endpoint and decode the JSON response.
+        
+        Args:
+            method (str): HTTP method
+            path (str): Endpoint path relative to the API base URL
+            **kwargs: Extra arguments passed to _send
+            
+        Returns:
+            Dict: Decoded response body
+        """
+        return orjson.loads(await self._send(method, path, **kwargs))
+
+    async def _download(self, file_id: str) -> bytes:
+        """
+        Download the content of a file stored with the Mistral API.
+        
+        Args:
+            file_id (str): ID of the file
+            
+        Returns:
+            bytes: File content
+        """
+        return await self._send("GET", f"files/{file_id}/content", timeout=TRANSFER_TIMEOUT)
+
+    def _cache_path(self, digest: str) -> Path:
+        """
+        Get the cache file for an input file digest and the OCR model.
+        
+        Args:
+            digest (str): Content digest of the PDF file
+            
+        Returns:
+            Path: Location of the cached OCR results
+        """
+        key = hashlib.sha256(f"{digest}:{OCR_MODEL}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _upload_path(self, digest: str) -> Path:
+        """
+        Get the upload record file for an input file digest.
+        
+        Args:
+            digest (str): Content digest of the PDF file
+            
+        Returns:
+            Path: Location of the file ID, signed URL and expiry of the upload
+        """
+        return self.uploads_dir / f"{digest}.json"
+
+    async def _sign_url(self, file_id: str, digest: Optional[str] = None) -> str:
+        """
+        Request a signed URL for an uploaded file, recording it in the upload cache
+        when a digest is given.
+        
+        Args:
+            file_id (str): ID of the uploaded file
+            digest (str, optional): Content digest of the PDF file
+            
+        Returns:
+            str: Signed URL of the uploaded file
+        """
+        expiry = time.time() + SIGNED_URL_EXPIRY_HOURS * 3600
+        file_url = await self._request(
+            "GET", f"files/{file_id}/url", params={"expiry": SIGNED_URL_EXPIRY_HOURS}
+        )
+        
+        if digest is not None:
+            save_cache(self._upload_path(digest), (file_id, file_url["url"], expiry))
+        return file_url["url"]
+
+    async def _get_document_url(
+        self,
+        input_path: Path,
+        digest: Optional[str] = None,
+        min_remaining: float = SIGNED_URL_MIN_REMAINING
+    ) -> str:
+        """
+        Get a signed URL for an input file, uploading it unless the same content
+        was uploaded before.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            digest (str, optional): Content digest of the PDF file; without one the
+                file is always uploaded and the upload is not recorded
+            min_remaining (float): Seconds a cached URL must still be valid for to be
+                reused; otherwise the uploaded file is signed again
+            
+        Returns:
+            str: Signed URL of the uploaded file
+        """
+        cached = load_cache(self._upload_path(digest)) if digest is not None else None
+        if cached is not None:
+            file_id, url, expiry = cached
+            if expiry > time.time() + min_remaining:
+                logger.info(f"Reusing uploaded file: {file_id}")
+                return url
+            
+            try:
+                url = await self._sign_url(file_id, digest)
+                logger.info(f"Reusing uploaded file: {file_id}")
+                return url
+            except aiohttp.ClientResponseError as e:
+                if e.status != 404:
+                    raise
+                logger.info(f"Uploaded file {file_id} no longer exists, uploading again")
+        
+        # Upload file; aiohttp streams the open handle as multipart chunks rather than
+        # reading it into memory. Each attempt gets a fresh handle, and the previous
+        # one is closed before it.
+        handles = []
+        
+        def upload_form() -> aiohttp.FormData:
+            while handles:
+                handles.pop().close()
+            handles.append(open(input_path, "rb"))
+            form = aiohttp.FormData()
+            form.add_field("purpose", "ocr")
+            form.add_field("file", handles[-1], filename=input_path.name, content_type="application/pdf")
+            return form
+        
+        try:
+            uploaded_file = await self._request("POST", "files", form=upload_form, timeout=TRANSFER_TIMEOUT)
+        finally:
+            while handles:
+                handles.pop().close()
+        logger.info(f"File uploaded successfully: {uploaded_file['id']}")
+        
+        return await self._sign_url(uploaded_file["id"], digest)
+
+    def _maybe_split(self, input_path: Path, max_pages: int = MAX_PAGES_PER_SLOT) -> List[Tuple[Path, int]]:
+        """
+        Split a PDF into slots of at most max_pages pages.
+        
+        Slot files are written to a new temporary directory under the cache, which
+        is only created once a split is needed. Files pypdf cannot read are sent whole,
+        since the OCR API may still accept them.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            max_pages (int): Maximum number of pages per slot
+            
+        Returns:
+            List[Tuple[Path, int]]: Path and first page index of each slot; the input
+                file itself when it is small enough or cannot be split
+        """
+        # pypdf copies a file given by path into memory; an open handle is read lazily
+        with open(input_path, "rb") as fh:
+            try:
+                reader = PdfReader(fh)
+                num_pages = reader.get_num_pages()
+            except Exception as e:
+                logger.warning(f"Could not read page count of {input_path.name}, sending it whole: {str(e)}")
+                return [(input_path, 0)]
+            
+            if num_pages <= max_pages:
+                return [(input_path, 0)]
+            
+            slot_dir = Path(tempfile.mkdtemp(dir=self.cache_dir))
+            try:
+                slots = []
+                for start in range(0, num_pages, max_pages):
+                    writer = PdfWriter()
+                    for index in range(start, min(start + max_pages, num_pages)):
+                        writer.add_page(reader.pages[index])
+                    slot_path = slot_dir / f"{input_path.stem}_{start // max_pages + 1}.pdf"
+                    writer.write(slot_path)
+                    slots.append((slot_path, start))
+                return slots
+            except Exception as e:
+                shutil.rmtree(slot_dir, ignore_errors=True)
+                logger.warning(f"Could not split {input_path.name}, sending it whole: {str(e)}")
+                return [(input_path, 0)]
 
-    def process_pdf(self, file_name: str) -> Dict:
+    async def _ocr_pages(self, input_path: Path, digest: str) -> List[Dict]:
+        """
+        OCR a PDF file, one slot at a time when it is too large to send whole.
+        
+        Args:
+            input_path (Path): Path to the PDF file
+            digest (str): Content digest of the PDF file
+            
+        Returns:
+            List[Dict]: Index and markdown of each page, in document order
+        """
+        slots = await asyncio.to_thread(self._maybe_split, input_path)
+        
+        try:
+            pages = []
+            for number, (slot_path, start) in enumerate(slots, 1):
+                # Slot files are temporary, so only whole files are worth recording
+                slot_digest = digest if slot_path == input_path else None
+                document_url = await self._get_document_url(slot_path, slot_digest)
+                
+                # Process with OCR
+                response = await self._request(
+                    "POST", "ocr",
+                    timeout=TRANSFER_TIMEOUT,
+                    json={
+                        "model": OCR_MODEL,
+                        "document": {
+                            "type": "document_url",
+                            "document_url": document_url
+                        }
+                    }
+                )
+                pages.extend(_page_records(response, start))
+                
+                if len(slots) > 1:
+                    logger.info(f"Processed slot {number}/{len(slots)} of {input_path.name}")
+        finally:
+            if slots[0][0] != input_path:
+                shutil.rmtree(slots[0][0].parent, ignore_errors=True)
+        
+        return pages
+
+    async def process_pdf(self, file_name: str, run_ts: Optional[datetime] = None) -> Dict:
         """
         Process a single PDF file using Mistral OCR.
         
         Args:
             file_name (str): Name of the PDF file in the data directory
+            run_ts (datetime, optional): Timestamp of the run. Defaults to the current time.
             
         Returns:
             Dict: Processed OCR results including file info and content
@@ -54,102 +508,244 @@ class MistralOCRParser:
         logger.info(f"Processing file: {file_name}")
         
         try:
-            # Upload file
-            with open(input_path, "rb") as f:
-                uploaded_file = self.client.files.upload(
-                    file={
-                        "file_name": str(input_path),
-                        "content": f
-                    },
-                    purpose="ocr"
-                )
-            logger.info(f"File uploaded successfully: {uploaded_file.id}")
-
-            # Get signed URL
-            file_url = self.client.files.get_signed_url(
-                file_id=uploaded_file.id
-            )
-            
-            # Process with OCR
-            response = self.client.ocr.process(
-                model="mistral-ocr-latest",
-                document={
-                    "type": "document_url",
-                    "document_url": file_url.url
-                }
-            )
-            
-            # Prepare results
-            results = {
-                "file_name": file_name,
-                "processed_at": datetime.now().isoformat(),
-                "pages": []
-            }
+            # Hashing reads the whole file, so keep it off the event loop
+            digest = await asyncio.to_thread(path_digest, input_path)
+            cache_path = self._cache_path(digest)
+            pages = load_cache(cache_path)
+            
+            if pages is None:
+                pages = await self._ocr_pages(input_path, digest)
+                save_cache(cache_path, pages)
+            else:
+                logger.info(f"Using cached OCR results for: {file_name}")
+            
+            results = self._save_results(file_name, pages, run_ts)
+            
+            if input_path.stat().st_size > GC_THRESHOLD_BYTES:
+                del pages
+                gc.collect()
             
-            # Extract content
-            for page in response.pages:
-                results["pages"].append({
-                    "page_number": page.index,
-                    "content": page.markdown
-                })
-            
-            # Save results
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_dir / f"{file_name.rsplit('.', 1)[0]}_{timestamp}.md"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"# OCR Results for {file_name}\n\n")
-                for page in results["pages"]:
-                    f.write(f"## Page {page['page_number']}\n\n")
-                    f.write(page["content"])
-                    f.write("\n\n---\n\n")
-            
-            logger.info(f"Results saved to: {output_file}")
             return results
             
         except Exception as e:
             logger.error(f"Error processing {file_name}: {str(e)}")
             raise
 
-    def process_directory(self) -> List[Dict]:
+    def _save_results(self, file_name: str, pages: List[Dict], run_ts: Optional[datetime] = None) -> Dict:
+        """
+        Write the OCR pages of a file to a markdown file.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            pages (List[Dict]): Index and markdown of each page
+            run_ts (datetime, optional): Timestamp of the run. Defaults to the current time.
+            
+        Returns:
+            Dict: Processing results including file info and page numbers
+        """
+        # Save results, writing each page as it is read; only page numbers are kept
+        now = run_ts or datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        output_file = self.output_dir / f"{Path(file_name).stem}_{timestamp}.md"
+        results = {
+            "file_name": file_name,
+            "processed_at": now.isoformat(),
+            "output_file": str(output_file),
+            "pages": []
+        }
+        
+        with open(output_file, 'wb') as f:
+            f.write(f"# OCR Results for {file_name}\n\n".encode('utf-8'))
+            for page in pages:
+                # Writing the parts separately skips building a joined copy of each page
+                f.writelines((
+                    PAGE_HEADER(page["index"]).encode('utf-8'),
+                    page["markdown"].encode('utf-8'),
+                    PAGE_SEPARATOR
+                ))
+                results["pages"].append({"page_number": page["index"]})
+        
+        logger.info(f"Results saved to: {output_file}")
+        return results
+
+    async def _process_pdf_limited(self, file_name: str, semaphore: asyncio.Semaphore, run_ts: datetime) -> Dict:
+        """
+        Process a single PDF file once a concurrency slot is free.
+        
+        Args:
+            file_name (str): Name of the PDF file in the data directory
+            semaphore (asyncio.Semaphore): Semaphore limiting concurrent files
+            run_ts (datetime): Timestamp of the directory run
+            
+        Returns:
+            Dict: Processed OCR results including file info and content
+        """
+        async with semaphore:
+            return await self.process_pdf(file_name, run_ts)
+
+    async def process_directory(self) -> List[Dict]:
         """
-        Process all PDF files in the data directory.
+        Process all PDF files in the data directory concurrently.
         
         Returns:
             List[Dict]: List of processing results for each file
         """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        file_names = list_pdfs(self.data_dir)
+        run_ts = datetime.now()
+        
+        outcomes = await asyncio.gather(
+            *[self._process_pdf_limited(file_name, semaphore, run_ts) for file_name in file_names],
+            return_exceptions=True
+        )
+        
         results = []
+        for file_name, outcome in zip(file_names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to process {file_name}: {str(outcome)}")
+                continue
+            results.append(outcome)
+        
+        return results
+
+    async def _run_batch(self, digests: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        OCR files with a single Mistral batch job.
+        
+        Args:
+            digests (Dict[str, str]): Content digest of each file name to process
+            
+        Returns:
+            Dict[str, List[Dict]]: OCR pages of each file that was processed successfully
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        # The job may wait in the queue for hours, so its URLs must outlive the job timeout
+        async def get_url(file_name: str) -> str:
+            async with semaphore:
+                return await self._get_document_url(
+                    self.data_dir / file_name, digests[file_name], BATCH_TIMEOUT_HOURS * 3600
+                )
+        
+        file_names = list(digests)
+        urls = await asyncio.gather(*[get_url(file_name) for file_name in file_names], return_exceptions=True)
+        
+        # One request per line, identified by file name
+        batch_input = bytearray()
+        submitted = set()
+        for file_name, url in zip(file_names, urls):
+            if isinstance(url, Exception):
+                logger.error(f"Failed to upload {file_name}: {str(url)}")
+                continue
+            submitted.add(file_name)
+            batch_input += orjson.dumps({
+                "custom_id": file_name,
+                "body": {"document": {"type": "document_url", "document_url": url}}
+            }, option=orjson.OPT_APPEND_NEWLINE)
+        if not batch_input:
+            return {}
+        
+        batch_input = bytes(batch_input)
+        
+        def batch_form() -> aiohttp.FormData:
+            form = aiohttp.FormData()
+            form.add_field("purpose", "batch")
+            form.add_field("file", batch_input, filename="batch.jsonl", content_type="application/jsonl")
+            return form
+        
+        batch_file = await self._request("POST", "files", form=batch_form, timeout=TRANSFER_TIMEOUT)
         
-        for pdf_file in self.data_dir.glob("*.pdf"):
+        job = await self._request(
+            "POST", "batch/jobs",
+            json={
+                "input_files": [batch_file["id"]],
+                "model": OCR_MODEL,
+                "endpoint": "/v1/ocr",
+                "timeout_hours": BATCH_TIMEOUT_HOURS
+            }
+        )
+        logger.info(f"Started batch job: {job['id']}")
+        
+        while job["status"] in BATCH_RUNNING_STATES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            job = await self._request("GET", f"batch/jobs/{job['id']}")
+        
+        if not job.get("output_file"):
+            raise RuntimeError(f"Mistral batch job {job['id']} failed: {job['status']}")
+        
+        # Split the job output back into per-file pages
+        results = {}
+        for line in (await self._download(job["output_file"])).splitlines():
+            record = orjson.loads(line)
+            file_name = record["custom_id"]
+            submitted.discard(file_name)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                logger.error(f"Failed to process {file_name}: {record.get('error') or response.get('body')}")
+                continue
+            pages = _page_records(response["body"])
+            save_cache(self._cache_path(digests[file_name]), pages)
+            results[file_name] = pages
+        
+        for file_name in submitted:
+            logger.error(f"Failed to process {file_name}: missing from batch output")
+        
+        return results
+
+    async def process_directory_batch(self) -> List[Dict]:
+        """
+        Process all PDF files in the data directory with one Mistral batch job.
+        
+        Files with cached OCR results are written directly; the rest are submitted
+        together and the job output is split back into one result per file.
+        
+        Returns:
+            List[Dict]: List of processing results for each file
+        """
+        file_names = list_pdfs(self.data_dir)
+        
+        # Hashing reads each whole file, so keep it off the event loop
+        file_digests = await asyncio.gather(
+            *[asyncio.to_thread(path_digest, self.data_dir / file_name) for file_name in file_names]
+        )
+        
+        cached = {}
+        digests = {}
+        for file_name, digest in zip(file_names, file_digests):
+            pages = load_cache(self._cache_path(digest))
+            if pages is None:
+                digests[file_name] = digest
+            else:
+                logger.info(f"Using cached OCR results for: {file_name}")
+                cached[file_name] = pages
+        
+        if digests:
             try:
-                result = self.process_pdf(pdf_file.name)
-                results.append(result)
+                cached.update(await self._run_batch(digests))
             except Exception as e:
-                logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
-                continue
+                logger.error(f"Batch processing failed: {str(e)}")
+        
+        run_ts = datetime.now()
+        results = []
+        for file_name in file_names:
+            if file_name in cached:
+                results.append(self._save_results(file_name, cached[file_name], run_ts))
         
         return results
 
-def main():
+async def main():
     """Main function to demonstrate PDF content extraction using Mistral OCR."""
     try:
-        # Load environment variables
-        load_dotenv()
-        
         # Initialize parser
-        parser = MistralOCRParser()
-        
-        # Process single file
-        sample_file = "sample-pdf.pdf"
-        logger.info(f"Processing single file: {sample_file}")
-        results = parser.process_pdf(sample_file)
+        async with MistralOCRParser() as parser:
+            # Process single file
+            sample_file = "sample-pdf.pdf"
+            logger.info(f"Processing single file: {sample_file}")
+            results = await parser.process_pdf(sample_file)
         
         # Print results
         print("\nOCR Results:")
-        for page in results["pages"]:
-            print(f"\n--- Page {page['page_number']} ---\n")
-            print(page["content"])
-            print("\n")
+        print(Path(results["output_file"]).read_text(encoding='utf-8'))
         
         logger.info("Processing completed successfully")
         
@@ -158,4 +754,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -1,8 +1,16 @@
 import os
+import gc
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import logging
-from typing import List, Optional
+from typing import List, Optional, ClassVar
 from pathlib import Path
 from langchain_unstructured import UnstructuredLoader
+try:
+    from ._common import list_pdfs
+except ImportError:
+    # Run as a script from the parser directory
+    from _common import list_pdfs
 from datetime import datetime
 
 # Configure logging
@@ -12,38 +20,67 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default number of files processed at the same time by process_directory
+DEFAULT_CONCURRENCY = 8
+
+# Files larger than this many bytes trigger a garbage collection once processed,
+# so long directory runs do not leave fragmented memory behind
+GC_THRESHOLD_BYTES = 50 * 1024 * 1024
+
 class UnstructuredParser:
     """Parser class for extracting content from PDFs using Unstructured.io API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Set once the output directories exist, so later instances skip the mkdir calls
+    _dirs_ready: ClassVar[bool] = False
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        partition_via_api: bool = True,
+        workers: Optional[int] = None
+    ):
         """
         Initialize parser with API key and base configuration.
         
         Args:
             api_key (str, optional): Unstructured.io API key. Defaults to environment variable.
+            concurrency (int, optional): Number of files sent to the API at the same time by
+                process_directory. Defaults to the OCR_CONCURRENCY environment variable.
+            partition_via_api (bool): Partition with the Unstructured.io API instead of locally.
+            workers (int, optional): Number of worker processes used by process_directory
+                for local partitioning. Defaults to the number of CPUs.
         """
+        self.partition_via_api = partition_via_api
         self.api_key = api_key or os.getenv("UNSTRUCTURED_API_KEY")
-        if not self.api_key:
+        if partition_via_api and not self.api_key:
             raise ValueError("UNSTRUCTURED_API_KEY not set in environment variables")
         
+        self.concurrency = concurrency or int(os.getenv("OCR_CONCURRENCY", DEFAULT_CONCURRENCY))
+        self.workers = workers or os.cpu_count()
+        
         # Get project root directory
         self.project_root = Path(__file__).parent.parent.parent
+        self.input_dir = self.project_root / "input"
         
         # Create output directory if it doesn't exist
         self.output_dir = self.project_root / "output"
-        self.output_dir.mkdir(exist_ok=True)
+        if not type(self)._dirs_ready:
+            self.output_dir.mkdir(exist_ok=True)
+            type(self)._dirs_ready = True
 
-    def process_pdf(self, file_name: str) -> str:
+    def process_pdf(self, file_name: str, run_ts: Optional[datetime] = None) -> str:
         """
         Process a single PDF file and extract its content.
         
         Args:
             file_name (str): Name of the PDF file in the input directory
+            run_ts (datetime, optional): Timestamp of the run. Defaults to the current time.
             
         Returns:
             str: Path to the output file containing extracted content
         """
-        input_path = self.project_root / "input" / file_name
+        input_path = self.input_dir / file_name
         
         if not input_path.exists():
             raise FileNotFoundError(f"Input file not found: {input_path}")
@@ -55,22 +92,31 @@ class UnstructuredParser:
             loader = UnstructuredLoader(
                 file_path=str(input_path),
                 api_key=self.api_key,
-                partition_via_api=True
+                partition_via_api=self.partition_via_api
             )
             
-            # Extract content
-            docs = loader.load()
-            
-            # Prepare output
-            extracted_content = "\n".join(doc.page_content for doc in docs)
-            
             # Generate output filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_dir / f"{file_name.rsplit('.', 1)[0]}_{timestamp}.txt"
+            timestamp = (run_ts or datetime.now()).strftime("%Y%m%d_%H%M%S")
+            output_file = self.output_dir / f"{Path(file_name).stem}_{timestamp}.txt"
+            
+            # Extract content, writing each document as the loader yields it to a sibling
+            # file that only replaces the output once extraction has finished
+            tmp_file = output_file.with_suffix(".txt.tmp")
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    separator = ""
+                    for doc in loader.lazy_load():
+                        f.write(separator)
+                        f.write(doc.page_content)
+                        separator = "\n"
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
+            os.replace(tmp_file, output_file)
             
-            # Save extracted content
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(extracted_content)
+            if input_path.stat().st_size > GC_THRESHOLD_BYTES:
+                del loader
+                gc.collect()
             
             logger.info(f"Content extracted and saved to: {output_file}")
             return str(output_file)
@@ -79,23 +125,43 @@ class UnstructuredParser:
             logger.error(f"Error processing {file_name}: {str(e)}")
             raise
 
-    def process_directory(self) -> List[str]:
+    def _executor(self) -> Executor:
         """
-        Process all PDF files in the input directory.
+        Create the pool that process_directory runs files in.
+        
+        API partitioning waits on the network, so threads are enough; local
+        partitioning is CPU-bound and runs in separate processes.
+        
+        Returns:
+            Executor: Thread or process pool sized for the partitioning mode
+        """
+        if self.partition_via_api:
+            return ThreadPoolExecutor(max_workers=self.concurrency)
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    async def process_directory(self) -> List[str]:
+        """
+        Process all PDF files in the input directory concurrently.
         
         Returns:
             List[str]: List of paths to output files
         """
-        input_dir = self.project_root / "input"
-        output_files = []
+        loop = asyncio.get_running_loop()
+        file_names = list_pdfs(self.input_dir)
+        run_ts = datetime.now()
         
-        for pdf_file in input_dir.glob("*.pdf"):
-            try:
-                output_file = self.process_pdf(pdf_file.name)
-                output_files.append(output_file)
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
+        with self._executor() as executor:
+            outcomes = await asyncio.gather(
+                *[loop.run_in_executor(executor, self.process_pdf, file_name, run_ts) for file_name in file_names],
+                return_exceptions=True
+            )
+        
+        output_files = []
+        for file_name, outcome in zip(file_names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to process {file_name}: {str(outcome)}")
                 continue
+            output_files.append(outcome)
         
         return output_files
 
@@ -112,7 +178,7 @@ def main():
         
         # Process all files in directory
         logger.info("Processing all PDF files in input directory")
-        output_files = parser.process_directory()
+        output_files = asyncio.run(parser.process_directory())
         logger.info(f"Processed {len(output_files)} files successfully")
         
     except Exception as e: